@@ -10,7 +10,8 @@
 # =============================================================================
 import pandas as pd
 import numpy as np
-import re
+import csv
+import sys
 import matplotlib.pyplot as plt
 from datetime import datetime, timedelta
 from sklearn.ensemble import IsolationForest
@@ -20,6 +21,11 @@ import seaborn as sns
 sns.set(style="whitegrid")
 plt.rcParams["figure.figsize"] = (10,6)
 
+# Colunas presentes em cada linha de log: data hora | IP | nível | mensagem
+COLUNAS_LOG = ["timestamp", "ip", "nivel", "mensagem"]
+# Classes possíveis para os eventos, em ordem crescente de gravidade
+ORDEM_CLASSIFICACAO = ["Normal", "Suspeito", "Crítico"]
+
 # =============================================================================
 # Etapa 2: Simulação e Coleta de Logs
 # - Criação de um arquivo de log fictício com informações simuladas.
@@ -29,36 +35,40 @@ plt.rcParams["figure.figsize"] = (10,6)
 # Função para simular dados de log
 def simula_logs(n=500):
     """Gera uma lista de strings simulando linhas de log."""
-    logs = []
-    base_time = datetime.now() - timedelta(hours=1)  # logs dos últimos 60 minutos
-    niveis = ['INFO', 'WARN', 'ERROR']
-    mensagens = ['Acesso permitido', 'Acesso negado', 'Transação realizada',
-                 'Falha de autenticação', 'Tentativa de invasão']
-
-    for i in range(n):
-        # Incremento de tempo aleatório
-        timestamp = base_time + timedelta(seconds=np.random.randint(0, 3600))
-        # Formatação da data/hora
-        ts_str = timestamp.strftime("%Y-%m-%d %H:%M:%S")
-        # Geração aleatória de IP
-        ip = ".".join(str(np.random.randint(1, 255)) for _ in range(4))
-        # Seleção aleatória do nível e mensagem
-        nivel = np.random.choice(niveis, p=[0.7, 0.2, 0.1])
-        mensagem = np.random.choice(mensagens)
-
-        # Em casos de ERROR, simula uma mensagem crítica (anomalia potencial)
-        if nivel == 'ERROR':
-            mensagem += " - Possível ataque detectado"
-
-        log_line = f"{ts_str} | {ip} | {nivel} | {mensagem}"
-        logs.append(log_line)
-    return logs
+    rng = np.random.default_rng()
+    base_time = pd.Timestamp(datetime.now() - timedelta(hours=1))  # logs dos últimos 60 minutos
+    niveis = np.array(['INFO', 'WARN', 'ERROR'])
+    mensagens = np.array(['Acesso permitido', 'Acesso negado', 'Transação realizada',
+                          'Falha de autenticação', 'Tentativa de invasão'])
+
+    # Todos os campos são sorteados de uma só vez, em vez de um laço por linha
+    segundos = rng.integers(0, 3600, n)
+    octetos = rng.integers(1, 255, (n, 4))
+    niveis_idx = rng.choice(3, n, p=[0.7, 0.2, 0.1])
+    mensagens_idx = rng.integers(0, len(mensagens), n)
+
+    # Incremento de tempo aleatório e formatação da data/hora
+    ts_str = (base_time + pd.to_timedelta(segundos, unit='s')).strftime("%Y-%m-%d %H:%M:%S")
+    # Geração aleatória de IP
+    octetos_str = octetos.astype(str)
+    ip = pd.Series(octetos_str[:, 0])
+    for j in range(1, 4):
+        ip = ip + "." + octetos_str[:, j]
+    # Seleção aleatória do nível e mensagem
+    nivel = niveis[niveis_idx]
+    mensagem = mensagens[mensagens_idx].astype(object)
+
+    # Em casos de ERROR, simula uma mensagem crítica (anomalia potencial)
+    erro = nivel == 'ERROR'
+    mensagem[erro] = mensagem[erro] + " - Possível ataque detectado"
+
+    logs = pd.Series(ts_str) + " | " + ip + " | " + nivel + " | " + mensagem
+    return logs.tolist()
 
 # Gerar e salvar logs simulados em um arquivo (simulação de coleta de logs)
 logs_simulados = simula_logs(n=500)
 with open("logs_simulados.txt", "w", encoding="utf-8") as f:
-    for linha in logs_simulados:
-        f.write(linha + "\n")
+    f.write("\n".join(logs_simulados) + "\n")
 
 print("Arquivo de logs simulados gerado com sucesso!")
 
@@ -71,27 +81,22 @@ print("Arquivo de logs simulados gerado com sucesso!")
 # Função para ler e estruturar os logs
 def ingestao_logs(file_path):
     """Lê o arquivo de logs e retorna um DataFrame estruturado."""
-    # Lista para armazenar dicionários com os campos extraídos
-    data = []
-    # Expressão regular para extrair os campos do log
-    padrao = r"^(.*?) \| (.*?) \| (.*?) \| (.*)$"
-
-    with open(file_path, "r", encoding="utf-8") as f:
-        for linha in f:
-            linha = linha.strip()
-            match = re.match(padrao, linha)
-            if match:
-                ts, ip, nivel, mensagem = match.groups()
-                data.append({
-                    "timestamp": ts,
-                    "ip": ip,
-                    "nivel": nivel,
-                    "mensagem": mensagem
-                })
-    # Conversão para DataFrame
-    df = pd.DataFrame(data)
-    # Converter a coluna de timestamp para datetime
-    df['timestamp'] = pd.to_datetime(df['timestamp'], format="%Y-%m-%d %H:%M:%S")
+    # Leitura com o parser em C do pandas, usando '|' como delimitador dos campos.
+    # O parser lê o arquivo em blocos grandes, sem iterar linha a linha em Python.
+    # Linhas fora do formato esperado são descartadas.
+    df = pd.read_csv(file_path, sep="|", header=None, names=COLUNAS_LOG,
+                     dtype="string[pyarrow]", encoding="utf-8", quoting=csv.QUOTE_NONE,
+                     skipinitialspace=True, on_bad_lines="skip")
+    df = df.dropna()
+    # Remoção dos espaços ao redor do delimitador ' | ' (operação vetorizada)
+    for coluna in COLUNAS_LOG:
+        df[coluna] = df[coluna].str.strip()
+    df = df.reset_index(drop=True)
+    # Nível (INFO/WARN/ERROR) e IP se repetem muito: armazenados como categorias
+    df['nivel'] = df['nivel'].astype('category')
+    df['ip'] = df['ip'].astype('category')
+    # Converter a coluna de timestamp para datetime (cache evita reconverter timestamps repetidos)
+    df['timestamp'] = pd.to_datetime(df['timestamp'], format="%Y-%m-%d %H:%M:%S", cache=True)
     return df
 
 # Ingestão dos dados
@@ -111,9 +116,10 @@ print(df_logs.head())
 def extrai_features(df):
     """Adiciona colunas de features extraídas dos logs."""
     # Flag para indicar se a mensagem sugere comportamento anômalo
-    df['possivel_ataque'] = df['mensagem'].apply(lambda x: 1 if "ataque" in x.lower() else 0)
+    # (colunas string[pyarrow] usam o kernel nativo do Arrow, sem cópia em minúsculas)
+    df['possivel_ataque'] = df['mensagem'].str.contains("ataque", case=False, regex=False).astype(np.int8)
     # Extração de hora para análises temporais
-    df['hora'] = df['timestamp'].dt.hour
+    df['hora'] = df['timestamp'].dt.hour.astype(np.int8)
     return df
 
 df_logs = extrai_features(df_logs)
@@ -127,15 +133,29 @@ print(df_logs.head())
 # =============================================================================
 
 # Seleção das features para o modelo
-features = df_logs[['hora', 'possivel_ataque']]
+# Array float32 contíguo (ordem C), o formato usado internamente pelas árvores do
+# scikit-learn, evitando uma cópia em cada chamada de fit/score_samples
+features = np.ascontiguousarray(df_logs[['hora', 'possivel_ataque']].to_numpy(dtype=np.float32))
 
 # Criação e treinamento do modelo de detecção de anomalias
-modelo_if = IsolationForest(n_estimators=100, contamination=0.1, random_state=42)
+# O limiar de contaminação é calculado abaixo, por isso o modelo é ajustado com
+# contamination="auto" (o fit não precisa pontuar todas as linhas de treino)
+contamination = 0.1
+modelo_if = IsolationForest(n_estimators=100, contamination="auto", random_state=42, n_jobs=-1)
 modelo_if.fit(features)
 
+# As features têm baixa cardinalidade (no máximo 24 horas x 2 flags): apenas as
+# combinações distintas percorrem as árvores, e os scores são propagados às linhas
+combinacoes, inverso, contagens = np.unique(features, axis=0, return_inverse=True,
+                                            return_counts=True)
+scores = modelo_if.score_samples(combinacoes)
+# Mesmo limiar que o IsolationForest usaria: percentil de contaminação dos scores de treino
+modelo_if.offset_ = np.percentile(np.repeat(scores, contagens), 100 * contamination)
+
 # Predição de anomalias: -1 para anomalia, 1 para normal
-df_logs['anomaly_score'] = modelo_if.decision_function(features)
-df_logs['anomaly'] = modelo_if.predict(features)
+# (equivalente a decision_function e predict, com uma única passagem pelas árvores)
+df_logs['anomaly_score'] = (scores - modelo_if.offset_)[inverso.ravel()]
+df_logs['anomaly'] = np.where(df_logs['anomaly_score'] < 0, -1, 1)
 
 print("Detecção de anomalias concluída. Contagem de rótulos (-1: anomalia, 1: normal):")
 print(df_logs['anomaly'].value_counts())
@@ -149,16 +169,16 @@ print(df_logs['anomaly'].value_counts())
 #   * Críticos: logs marcados como anomalia (-1) e com indicação de ataque.
 # =============================================================================
 
-def classifica_eventos(row):
-    """Classifica cada log com base na predição do modelo e na presença de indicadores de ataque."""
-    if row['anomaly'] == -1 and row['possivel_ataque'] == 1:
-        return "Crítico"
-    elif row['anomaly'] == 1 and row['possivel_ataque'] == 1:
-        return "Suspeito"
-    else:
-        return "Normal"
+def classifica_eventos(df):
+    """Classifica os logs com base na predição do modelo e na presença de indicadores de ataque."""
+    # Comparações vetorizadas sobre os arrays NumPy, sem percorrer o DataFrame linha a linha
+    anomaly = df['anomaly'].to_numpy()
+    ataque = df['possivel_ataque'].to_numpy()
+    classificacao = np.where((anomaly == -1) & (ataque == 1), "Crítico",
+                             np.where((anomaly == 1) & (ataque == 1), "Suspeito", "Normal"))
+    return pd.Categorical(classificacao, categories=ORDEM_CLASSIFICACAO)
 
-df_logs['classificacao'] = df_logs.apply(classifica_eventos, axis=1)
+df_logs['classificacao'] = classifica_eventos(df_logs)
 print("Classificação de eventos realizada. Distribuição:")
 print(df_logs['classificacao'].value_counts())
 
@@ -171,11 +191,16 @@ print(df_logs['classificacao'].value_counts())
 def gerar_alertas(df):
     """Gera alertas para eventos críticos."""
     eventos_criticos = df[df['classificacao'] == "Crítico"]
-    for idx, evento in eventos_criticos.iterrows():
-        alerta = (f"ALERTA CRÍTICO: {evento['timestamp']} | IP: {evento['ip']} | "
-                  f"Nível: {evento['nivel']} | Mensagem: {evento['mensagem']}")
-        # Neste exemplo, o alerta é impresso; em produção, poderia ser enviado por email ou outro meio.
-        print(alerta)
+    if eventos_criticos.empty:
+        return
+    # Montagem vetorizada das mensagens, sem iterrows()
+    alertas = ("ALERTA CRÍTICO: " + eventos_criticos['timestamp'].astype(str)
+               + " | IP: " + eventos_criticos['ip'].astype(str)
+               + " | Nível: " + eventos_criticos['nivel'].astype(str)
+               + " | Mensagem: " + eventos_criticos['mensagem'])
+    # Neste exemplo, os alertas são impressos em uma única escrita; em produção,
+    # poderiam ser enviados por email ou outro meio.
+    sys.stdout.write("\n".join(alertas.tolist()) + "\n")
 
 print("Gerando alertas para eventos críticos:")
 gerar_alertas(df_logs)
@@ -192,7 +217,7 @@ print(contagem_classificacao)
 
 # Gráfico de barras para a classificação dos eventos
 plt.figure()
-sns.countplot(x='classificacao', data=df_logs, order=["Normal", "Suspeito", "Crítico"])
+sns.countplot(x='classificacao', data=df_logs, order=ORDEM_CLASSIFICACAO)
 plt.title("Distribuição de Eventos por Classificação")
 plt.xlabel("Classificação")
 plt.ylabel("Contagem")
@@ -10,18 +10,28 @@
 # =============================================================================
 import pandas as pd
 import numpy as np
-import re
+import csv
 import matplotlib.pyplot as plt
 from datetime import datetime
 from sklearn.ensemble import IsolationForest
 import seaborn as sns
 import json
 import os
+import sys
+import io
+import multiprocessing
 
 # Configurações para gráficos
 sns.set(style="whitegrid")
 plt.rcParams["figure.figsize"] = (10,6)
 
+# Colunas presentes em cada linha de log: data hora | IP | nível | mensagem
+COLUNAS_LOG = ["timestamp", "ip", "nivel", "mensagem"]
+# Classes possíveis para os eventos, em ordem crescente de gravidade
+ORDEM_CLASSIFICACAO = ["Normal", "Suspeito", "Crítico"]
+# Tamanho mínimo de arquivo (em bytes) para dividir a ingestão entre vários processos
+TAMANHO_MINIMO_PARALELO = 64 * 1024 * 1024
+
 # =============================================================================
 # Etapa 2: Função para carregar parâmetros reais do contexto
 # - Esses parâmetros podem influenciar a análise (ex.: fuso horário, taxa esperada de anomalias,
@@ -48,26 +58,62 @@ def ler_config_contexto(config_path="config_contexto.json"):
 # Etapa 3: Ingestão dos Dados a partir do arquivo de log real
 # - O arquivo de log deve ser uma representação fiel do ambiente real.
 # =============================================================================
-def ingestao_logs(file_path):
-    """Lê o arquivo de logs real e retorna um DataFrame estruturado sem manipulação dos dados."""
-    data = []
-    padrao = r"^(.*?) \| (.*?) \| (.*?) \| (.*)$"  # Expressão regular para extrair os campos
-
-    with open(file_path, "r", encoding="utf-8") as f:
-        for linha in f:
-            linha = linha.strip()
-            match = re.match(padrao, linha)
-            if match:
-                ts, ip, nivel, mensagem = match.groups()
-                data.append({
-                    "timestamp": ts,
-                    "ip": ip,
-                    "nivel": nivel,
-                    "mensagem": mensagem
-                })
-    df = pd.DataFrame(data)
-    # Conversão da coluna de timestamp para datetime
-    df['timestamp'] = pd.to_datetime(df['timestamp'], format="%Y-%m-%d %H:%M:%S")
+def _le_trecho_logs(fonte):
+    """Converte um arquivo (ou buffer) de logs em DataFrame com os campos já limpos."""
+    # Parser em C do pandas com '|' como delimitador; linhas fora do formato são descartadas.
+    # O arquivo é lido em blocos grandes pelo próprio parser, e não linha a linha em Python.
+    df = pd.read_csv(fonte, sep="|", header=None, names=COLUNAS_LOG,
+                     dtype="string[pyarrow]", encoding="utf-8", quoting=csv.QUOTE_NONE,
+                     skipinitialspace=True, on_bad_lines="skip")
+    df = df.dropna()
+    # Remoção dos espaços ao redor do delimitador ' | ' (operação vetorizada)
+    for coluna in COLUNAS_LOG:
+        df[coluna] = df[coluna].str.strip()
+    # Conversão da coluna de timestamp para datetime (com cache para timestamps repetidos)
+    df['timestamp'] = pd.to_datetime(df['timestamp'], format="%Y-%m-%d %H:%M:%S", cache=True)
+    return df
+
+def _le_intervalo_logs(args):
+    """Lê as linhas que começam no intervalo de bytes [inicio, fim) do arquivo de logs."""
+    file_path, inicio, fim = args
+    with open(file_path, "rb") as f:
+        # Avança até o início da próxima linha; a linha cortada pertence ao trecho anterior
+        if inicio > 0:
+            f.seek(inicio - 1)
+            f.readline()
+        posicao = f.tell()
+        if posicao >= fim:
+            return None
+        dados = f.read(fim - posicao)
+        # Completa a última linha, que pode ultrapassar o fim do intervalo
+        if not dados.endswith(b"\n"):
+            dados += f.readline()
+    if not dados.strip():
+        return None
+    return _le_trecho_logs(io.BytesIO(dados))
+
+def ingestao_logs(file_path, n_processos=None):
+    """Lê o arquivo de logs real e retorna um DataFrame estruturado sem manipulação dos dados.
+       Arquivos grandes são divididos em trechos lidos em paralelo por n_processos processos
+       (por padrão, um por núcleo)."""
+    n_processos = n_processos or os.cpu_count() or 1
+    tamanho = os.path.getsize(file_path)
+
+    if n_processos < 2 or tamanho < TAMANHO_MINIMO_PARALELO:
+        df = _le_trecho_logs(file_path)
+    else:
+        # Divide o arquivo em intervalos de bytes; cada processo ajusta os limites às quebras de linha
+        limites = np.linspace(0, tamanho, n_processos + 1, dtype=np.int64)
+        intervalos = [(file_path, int(inicio), int(fim)) for inicio, fim in zip(limites[:-1], limites[1:])]
+        with multiprocessing.Pool(n_processos) as pool:
+            # imap preserva a ordem dos trechos, mantendo a ordem original das linhas
+            trechos = [t for t in pool.imap(_le_intervalo_logs, intervalos) if t is not None]
+        df = pd.concat(trechos, ignore_index=True)
+
+    df = df.reset_index(drop=True)
+    # Nível (INFO/WARN/ERROR) e IP se repetem muito: armazenados como categorias
+    df['nivel'] = df['nivel'].astype('category')
+    df['ip'] = df['ip'].astype('category')
     return df
 
 # =============================================================================
@@ -77,9 +123,10 @@ def ingestao_logs(file_path):
 def extrai_features(df):
     """Adiciona colunas com features extraídas dos logs sem alterar os dados originais."""
     # Flag para indicar se a mensagem sugere comportamento anômalo (buscando pela palavra 'ataque')
-    df['possivel_ataque'] = df['mensagem'].apply(lambda x: 1 if "ataque" in x.lower() else 0)
+    # (colunas string[pyarrow] usam o kernel nativo do Arrow, sem cópia em minúsculas)
+    df['possivel_ataque'] = df['mensagem'].str.contains("ataque", case=False, regex=False).astype(np.int8)
     # Extração do horário para análises temporais
-    df['hora'] = df['timestamp'].dt.hour
+    df['hora'] = df['timestamp'].dt.hour.astype(np.int8)
     return df
 
 # =============================================================================
@@ -91,20 +138,33 @@ def detectar_anomalias(df, config):
     Treina o modelo IsolationForest considerando as features extraídas e os parâmetros do contexto.
     - Utiliza a taxa de contaminação definida em config (se disponível) para ajustar o modelo.
     """
-    # Seleção das features para o modelo
-    features = df[['hora', 'possivel_ataque']]
+    # Seleção das features para o modelo, como array float32 contíguo (ordem C),
+    # formato usado internamente pelas árvores do scikit-learn (evita cópias em fit/score)
+    features = np.ascontiguousarray(df[['hora', 'possivel_ataque']].to_numpy(dtype=np.float32))
     
     # Obtém o parâmetro de contaminação real do contexto; se não estiver definido, usa 0.1
     contamination = config.get("contamination", 0.1)
     print(f"Utilizando taxa de contaminação = {contamination}")
     
     # Criação e treinamento do modelo de detecção de anomalias
-    modelo_if = IsolationForest(n_estimators=100, contamination=contamination, random_state=42)
+    # O limiar de contaminação é calculado abaixo, então o modelo é ajustado com
+    # contamination="auto" e o fit não precisa pontuar todas as linhas de treino
+    modelo_if = IsolationForest(n_estimators=100, contamination="auto", random_state=42,
+                                n_jobs=-1)
     modelo_if.fit(features)
 
+    # Com features de baixa cardinalidade (no máximo 24 horas x 2 flags), apenas as
+    # combinações distintas percorrem as árvores e os scores são propagados às linhas
+    combinacoes, inverso, contagens = np.unique(features, axis=0, return_inverse=True,
+                                                return_counts=True)
+    scores = modelo_if.score_samples(combinacoes)
+    # Mesmo limiar do IsolationForest: percentil de contaminação dos scores de treino
+    modelo_if.offset_ = np.percentile(np.repeat(scores, contagens), 100 * contamination)
+
     # Predição de anomalias: -1 para anomalia, 1 para normal
-    df['anomaly_score'] = modelo_if.decision_function(features)
-    df['anomaly'] = modelo_if.predict(features)
+    # (equivalente a decision_function e predict, com uma única passagem pelas árvores)
+    df['anomaly_score'] = (scores - modelo_if.offset_)[inverso.ravel()]
+    df['anomaly'] = np.where(df['anomaly_score'] < 0, -1, 1)
     
     print("Detecção de anomalias concluída. Contagem de rótulos (-1: anomalia, 1: normal):")
     print(df['anomaly'].value_counts())
@@ -115,14 +175,14 @@ def detectar_anomalias(df, config):
 # - Classifica eventos em Normais, Suspeitos ou Críticos, considerando a previsão do modelo
 #   e a presença de indicadores no log.
 # =============================================================================
-def classifica_eventos(row):
-    """Classifica cada log com base na predição do modelo e na presença de indicadores de ataque."""
-    if row['anomaly'] == -1 and row['possivel_ataque'] == 1:
-        return "Crítico"
-    elif row['anomaly'] == 1 and row['possivel_ataque'] == 1:
-        return "Suspeito"
-    else:
-        return "Normal"
+def classifica_eventos(df):
+    """Classifica os logs com base na predição do modelo e na presença de indicadores de ataque."""
+    # Comparações vetorizadas sobre os arrays NumPy, sem percorrer o DataFrame linha a linha
+    anomaly = df['anomaly'].to_numpy()
+    ataque = df['possivel_ataque'].to_numpy()
+    classificacao = np.where((anomaly == -1) & (ataque == 1), "Crítico",
+                             np.where((anomaly == 1) & (ataque == 1), "Suspeito", "Normal"))
+    return pd.Categorical(classificacao, categories=ORDEM_CLASSIFICACAO)
 
 # =============================================================================
 # Etapa 7: Geração de Alertas Automatizados
@@ -131,10 +191,14 @@ def classifica_eventos(row):
 def gerar_alertas(df):
     """Gera alertas para eventos críticos encontrados nos logs."""
     eventos_criticos = df[df['classificacao'] == "Crítico"]
-    for idx, evento in eventos_criticos.iterrows():
-        alerta = (f"ALERTA CRÍTICO: {evento['timestamp']} | IP: {evento['ip']} | "
-                  f"Nível: {evento['nivel']} | Mensagem: {evento['mensagem']}")
-        print(alerta)
+    if eventos_criticos.empty:
+        return
+    # Montagem vetorizada das mensagens e emissão em uma única escrita
+    alertas = ("ALERTA CRÍTICO: " + eventos_criticos['timestamp'].astype(str)
+               + " | IP: " + eventos_criticos['ip'].astype(str)
+               + " | Nível: " + eventos_criticos['nivel'].astype(str)
+               + " | Mensagem: " + eventos_criticos['mensagem'])
+    sys.stdout.write("\n".join(alertas.tolist()) + "\n")
 
 # =============================================================================
 # Etapa 8: Visualização dos Eventos Processados
@@ -148,7 +212,7 @@ def visualizar_eventos(df):
 
     # Gráfico de barras para a classificação dos eventos
     plt.figure()
-    sns.countplot(x='classificacao', data=df, order=["Normal", "Suspeito", "Crítico"])
+    sns.countplot(x='classificacao', data=df, order=ORDEM_CLASSIFICACAO)
     plt.title("Distribuição de Eventos por Classificação")
     plt.xlabel("Classificação")
     plt.ylabel("Contagem")
@@ -180,7 +244,8 @@ if __name__ == "__main__":
     log_file_path = "logs_reais.txt"
 
     try:
-        df_logs = ingestao_logs(log_file_path)
+        # Número de processos da ingestão (opcional no config; por padrão, um por núcleo)
+        df_logs = ingestao_logs(log_file_path, config.get("n_processos"))
         print("Ingestão concluída. Exibindo as primeiras linhas do DataFrame:")
         print(df_logs.head())
 
@@ -192,7 +257,7 @@ if __name__ == "__main__":
         df_logs = detectar_anomalias(df_logs, config)
         
         # Classifica os eventos conforme os critérios definidos
-        df_logs['classificacao'] = df_logs.apply(classifica_eventos, axis=1)
+        df_logs['classificacao'] = classifica_eventos(df_logs)
         print("Classificação de eventos realizada. Distribuição:")
         print(df_logs['classificacao'].value_counts())
 